@@ -1,18 +1,23 @@
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener, MemoryHandler
+import atexit
+import queue
 import os
 import json
 import time
 import asyncio
 from datetime import datetime, timedelta
-from threading import Lock
-from functools import wraps
-from typing import List, Any, Optional, Generator, Tuple, Dict
+from threading import Lock, Thread
+from collections import deque
+from functools import wraps, lru_cache
+import itertools
+from typing import List, Any, Optional, Generator, Tuple, Dict, Callable, Iterator
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 from openai import AsyncOpenAI
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
+from spotipy.cache_handler import CacheFileHandler
 from playwright.async_api import async_playwright
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import shutil
@@ -23,13 +28,25 @@ from urllib.parse import urljoin, urlparse
 from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import sys
-import textwrap
 import random
 import aiofiles
 from asyncio import Lock as AsyncLock
 import aiohttp
 from cachetools import TTLCache
 import re
+import hashlib
+import bisect
+import sqlite3
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to character-based chunking
+    tiktoken = None
 
 # Suppress specific warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -37,33 +54,180 @@ urllib3.disable_warnings(urllib3.exceptions.HTTPWarning)
 warnings.filterwarnings("ignore", message=".*Content-Length and Transfer-Encoding.*", 
                        category=UserWarning, module='urllib3')
 
+# Directory containing this script; data files live beside it whatever the working directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(BASE_DIR, "logfiles")
+
 # Global cache configurations
 CACHE_TTL = 3600  # 1 hour cache lifetime
 request_cache = TTLCache(maxsize=100, ttl=CACHE_TTL)
 spotify_cache = TTLCache(maxsize=1000, ttl=CACHE_TTL)
+# Fetched page HTML is large and goes stale quickly, so keep only a few pages briefly
+page_cache = TTLCache(maxsize=64, ttl=300)
+
+# Default locations for scan results
+JSON_DIR = os.path.join(BASE_DIR, "JSON")
+DEFAULT_URL_RESULTS = os.path.join(JSON_DIR, "spotscrape_url.json")
+DEFAULT_GPT_RESULTS = os.path.join(JSON_DIR, "spotscrape_gpt.json")
+
+# Spotify OAuth token cache, kept next to the script so it is reused across runs
+SPOTIFY_TOKEN_CACHE = os.path.join(BASE_DIR, ".spotify_token")
+
+# Environment variables that must be set (usually via .env) before running
+REQUIRED_ENV_VARS = (
+    "SPOTIPY_CLIENT_ID",
+    "SPOTIPY_CLIENT_SECRET",
+    "SPOTIPY_REDIRECT_URI",
+    "OPENAI_API_KEY"
+)
+
+# On-disk HTTP cache for Spotify search and album lookups, so repeat runs skip the API.
+# Album IDs for a given search do not change, so these entries are kept for a day.
+SPOTIFY_HTTP_CACHE = os.path.join(BASE_DIR, "spotify_cache")
+SPOTIFY_HTTP_CACHE_TTL = CACHE_TTL * 24
+
+# On-disk cache of GPT responses keyed by a hash of the request, kept for a week
+GPT_CACHE_PATH = os.path.join(BASE_DIR, "gpt_cache.sqlite")
+GPT_CACHE_TTL = 7 * 24 * 3600
+
+# GPT result lines containing any of these are dropped
+_EXCLUDED_RESULT_WORDS = ('ep', 'single', 'remix', 'feat.')
+
+# Content is split into chunks of this many tokens before being sent to GPT,
+# leaving room in the context window for the system prompt and the completion
+GPT_CHUNK_TOKENS = 3000
+
+# Browser identity shared by Playwright and the plain HTTP fast path
+_BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+_BROWSER_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate, br",
+    "DNT": "1",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1"
+}
+
+# aiohttp negotiates encoding and keep-alive itself
+_STATIC_HEADERS = {
+    "User-Agent": _BROWSER_USER_AGENT,
+    **{k: v for k, v in _BROWSER_HEADERS.items() if k not in ("Accept-Encoding", "Connection")}
+}
+
+# A server-rendered page is used without a browser when its main content has at least this much text
+STATIC_MIN_TEXT = 500
+
+# Resource types WebContentExtractor doesn't download, since only page text is used
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet', 'websocket', 'texttrack', 'manifest'})
+
+# Maximum number of Spotify lookups in flight at once
+SPOTIFY_CONCURRENCY = 16
+
+# Maximum number of GPT requests in flight at once
+GPT_CONCURRENCY = 5
+
+# Search term cleanup tables
+_ARTIST_TRANS = str.maketrans({'$': 's', '/': ' '})
+_ALBUM_TRANS = str.maketrans({'/': ' '})
+
+# Shared HTML parser and page cleanup configuration
+_HTML_PARSER = lxml_html.HTMLParser(remove_blank_text=True, remove_comments=True)
+_STRIP_TAGS = ('script', 'style', 'meta', 'link', 'noscript', 'iframe', 'svg',
+               'path', 'button', 'input', 'form', 'nav', 'footer', 'header')
+_MAIN_CONTENT_XPATHS = tuple(etree.XPath(expr) for expr in (
+    '//main',
+    '//article',
+    '//*[@role="main"]',
+    '//*[contains(concat(" ", normalize-space(@class), " "), " article__body ")]',
+    '//*[contains(concat(" ", normalize-space(@class), " "), " content ")]',
+    '//*[@id="content"]',
+))
+
+# Same containers as the 'main, article, .article__body' selector the browser path waits for
+_STATIC_CONTENT_XPATHS = tuple(etree.XPath(expr) for expr in (
+    '//main',
+    '//article',
+    '//*[contains(concat(" ", normalize-space(@class), " "), " article__body ")]',
+))
+
+# Spotify album links in URI (spotify:album:ID), web URL, href and data-uri form.
+# Every supported format contains one of these two prefixes before the 22 character ID.
+_SPOTIFY_ALBUM_RE = re.compile(r'(?:spotify:album:|/album/)([a-zA-Z0-9]{22})', re.IGNORECASE)
+
+# Splits a Spotify URI or web URL into its (kind, id) parts
+_SPOTIFY_ID_RE = re.compile(r'(?:spotify:|spotify\.com/)(track|album|artist)[:/]([a-zA-Z0-9]{22})')
+
+# Leading <?xml ...?> declaration, which lxml refuses to parse from a str
+_XML_DECL_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+# Collapses runs of whitespace, including non-breaking spaces
+_WS_RE = re.compile(r'\s+')
+
+# Matches each non-empty line of a GPT response
+_LINE_RE = re.compile(r'[^\n]+')
 
 class ClientManager:
     """Singleton manager for API clients"""
     _spotify_instance = None
     _openai_instance = None
     _session = None
+    _extractor = None
+    _search_manager = None
+    _playlist_manager = None
     _lock = AsyncLock()
+    # Spotify setup can wait on an interactive OAuth flow, so it must not hold up the other clients
+    _spotify_lock = AsyncLock()
 
     @classmethod
     async def get_spotify(cls) -> spotipy.Spotify:
-        async with cls._lock:
-            if not cls._spotify_instance:
-                cls._spotify_instance = spotipy.Spotify(auth_manager=SpotifyOAuth(
+        if cls._spotify_instance is not None:
+            return cls._spotify_instance
+        async with cls._spotify_lock:
+            if cls._spotify_instance is None:
+                session = requests_cache.CachedSession(
+                    SPOTIFY_HTTP_CACHE,
+                    backend='sqlite',
+                    allowable_methods=('GET',),
+                    urls_expire_after={
+                        'api.spotify.com/v1/search': SPOTIFY_HTTP_CACHE_TTL,
+                        'api.spotify.com/v1/albums': SPOTIFY_HTTP_CACHE_TTL,
+                        '*': requests_cache.DO_NOT_CACHE,
+                    }
+                )
+                # spotipy only installs its retry policy on sessions it builds itself, so mirror it here.
+                # 429s are left out so the response and its Retry-After header reach spotify_throttle,
+                # and POSTs are never replayed since a failed create may still have gone through.
+                adapter = requests.adapters.HTTPAdapter(max_retries=urllib3.Retry(
+                    total=3,
+                    connect=None,
+                    read=False,
+                    allowed_methods=frozenset(['GET', 'PUT', 'DELETE']),
+                    status=3,
+                    backoff_factor=0.3,
+                    status_forcelist=(500, 502, 503, 504)
+                ))
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                spotify = spotipy.Spotify(auth_manager=SpotifyOAuth(
                     client_id=os.getenv("SPOTIPY_CLIENT_ID"),
                     client_secret=os.getenv("SPOTIPY_CLIENT_SECRET"),
                     redirect_uri=os.getenv("SPOTIPY_REDIRECT_URI"),
-                    scope="playlist-modify-public playlist-modify-private"
-                ))
+                    scope="playlist-modify-public playlist-modify-private",
+                    cache_handler=CacheFileHandler(cache_path=SPOTIFY_TOKEN_CACHE)
+                ), requests_session=session)
+                # Authenticate once here, so concurrent callers never start their own OAuth flows
+                try:
+                    await asyncio.to_thread(spotify.auth_manager.get_access_token, as_dict=False)
+                except Exception as e:
+                    logger.warning(f"Could not get Spotify access token: {e}")
+                cls._spotify_instance = spotify
             return cls._spotify_instance
 
     @classmethod
     async def get_openai(cls):
         """Get or create OpenAI client"""
+        if cls._openai_instance is not None:
+            return cls._openai_instance
         async with cls._lock:
             if cls._openai_instance is None:
                 cls._openai_instance = AsyncOpenAI(
@@ -76,77 +240,211 @@ class ClientManager:
 
     @classmethod
     async def get_session(cls) -> aiohttp.ClientSession:
+        if cls._session is not None and not cls._session.closed:
+            return cls._session
         async with cls._lock:
             if not cls._session or cls._session.closed:
                 cls._session = aiohttp.ClientSession(
                     timeout=aiohttp.ClientTimeout(total=30),
-                    connector=aiohttp.TCPConnector(limit=100)
+                    # Keep idle connections around between bursts; asyncio already sets TCP_NODELAY
+                    connector=aiohttp.TCPConnector(
+                        limit=100,
+                        limit_per_host=20,
+                        ttl_dns_cache=300,
+                        keepalive_timeout=75
+                    )
                 )
             return cls._session
 
+    @classmethod
+    async def get_extractor(cls) -> 'WebContentExtractor':
+        """Get the web content extractor shared across scans"""
+        if cls._extractor is not None:
+            return cls._extractor
+        async with cls._lock:
+            if cls._extractor is None:
+                cls._extractor = WebContentExtractor()
+            return cls._extractor
+
+    @classmethod
+    async def get_search_manager(cls) -> 'SpotifySearchManager':
+        """Get the search manager shared across scans, so its search cache persists between them"""
+        if cls._search_manager is not None:
+            return cls._search_manager
+        async with cls._lock:
+            if cls._search_manager is None:
+                cls._search_manager = SpotifySearchManager()
+            return cls._search_manager
+
+    @classmethod
+    async def get_playlist_manager(cls) -> 'PlaylistManager':
+        """Get the playlist manager shared across playlist creations"""
+        if cls._playlist_manager is not None:
+            return cls._playlist_manager
+        async with cls._lock:
+            if cls._playlist_manager is None:
+                cls._playlist_manager = PlaylistManager()
+            return cls._playlist_manager
+
     @classmethod
     async def cleanup(cls):
         """Cleanup resources"""
         if cls._session and not cls._session.closed:
             await cls._session.close()
         cls._session = None
+        if cls._extractor:
+            await cls._extractor.cleanup()
+        cls._extractor = None
 
 class RateLimiter:
     """Improved rate limiter with caching"""
-    def __init__(self, max_calls: int, time_period: int):
+    def __init__(self, max_calls: int, time_period: int, cache: bool = True):
         self.max_calls = max_calls
         self.time_period = time_period
-        self.calls = []
+        self.cache = cache
+        self.calls = deque()
         self._lock = AsyncLock()
         self._cache = TTLCache(maxsize=1000, ttl=time_period)
 
+    async def _wait_for_slot(self):
+        """Block until another call fits in the current window"""
+        now = time.monotonic()
+        while self.calls and now - self.calls[0] > self.time_period:
+            self.calls.popleft()
+        
+        if len(self.calls) >= self.max_calls:
+            sleep_time = self.time_period - (now - self.calls[0])
+            if sleep_time > 0:
+                await asyncio.sleep(sleep_time)
+            self.calls.popleft()
+        
+        self.calls.append(time.monotonic())
+
     def __call__(self, func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            cache_key = str(args) + str(kwargs)
+            cache_key = None
+            if self.cache:
+                try:
+                    cache_key = (args, tuple(sorted(kwargs.items())))
+                    hash(cache_key)
+                except TypeError:
+                    # Unhashable arguments (e.g. lists) are not cached
+                    cache_key = None
             
             # Check cache first
-            if cache_key in self._cache:
+            if cache_key is not None and cache_key in self._cache:
                 return self._cache[cache_key]
 
+            # Only slot accounting is serialized; the calls themselves may overlap
             async with self._lock:
-                now = datetime.now()
-                self.calls = [t for t in self.calls if (now - t).total_seconds() <= self.time_period]
-                
-                if len(self.calls) >= self.max_calls:
-                    sleep_time = self.time_period - (now - self.calls[0]).total_seconds()
-                    if sleep_time > 0:
-                        await asyncio.sleep(sleep_time)
-                    self.calls.pop(0)
-                
-                self.calls.append(now)
-                
-                result = await func(*args, **kwargs)
+                await self._wait_for_slot()
+            result = await func(*args, **kwargs)
+            
+            if cache_key is not None:
                 self._cache[cache_key] = result
-                return result
+            return result
                 
         return wrapper
 
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Get the Retry-After delay from a Spotify error response, if any"""
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After') or headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+class SpotifyThrottle:
+    """Runs blocking spotipy calls off the event loop and backs off together on 429s.
+    When any call is rate limited, every caller waits out the Retry-After delay
+    before sending its next request instead of hammering the API."""
+    def __init__(self, retries: int = 3, default_delay: float = 1.0):
+        self.retries = retries
+        self.default_delay = default_delay
+        self._resume_at = 0.0
+
+    async def call(self, func, *args, **kwargs):
+        for attempt in range(self.retries + 1):
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                return await asyncio.to_thread(func, *args, **kwargs)
+            except spotipy.SpotifyException as e:
+                # spotipy also reports exhausted server-error retries as a 429, but without a response
+                if e.http_status != 429 or not e.headers or attempt >= self.retries:
+                    raise
+                wait_time = retry_after_seconds(e) or self.default_delay * 2 ** attempt
+                self._resume_at = max(self._resume_at, time.monotonic() + wait_time)
+                logger.warning(f"Spotify rate limit hit, pausing requests for {wait_time:.1f}s")
+
+spotify_throttle = SpotifyThrottle()
+
+class GPTResultCache:
+    """Persists GPT responses in SQLite so identical requests are never paid for twice"""
+    def __init__(self, path: str, ttl: int):
+        self.path = path
+        self.ttl = ttl
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, created REAL, text TEXT)"
+            )
+        return self._conn
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            row = self._connect().execute(
+                "SELECT text FROM responses WHERE key = ? AND created > ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading GPT cache: {e}")
+            return None
+        return row[0] if row else None
+
+    def set(self, key: str, text: str):
+        try:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, time.time(), text))
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing GPT cache: {e}")
+
+gpt_cache = GPTResultCache(GPT_CACHE_PATH, GPT_CACHE_TTL)
+
 class FileHandler:
     """Handles file operations with proper path handling"""
     def __init__(self, file_path: str):
         # Convert to proper Windows path and expand user directory
         self.file_path = os.path.abspath(os.path.expanduser(file_path))
         self.directory = os.path.dirname(self.file_path)
+        # Create the directory once up front rather than on every load/save
+        os.makedirs(self.directory, exist_ok=True)
 
     async def load(self) -> List[Dict]:
         """Load JSON data from file"""
         try:
-            # Ensure directory exists
-            os.makedirs(self.directory, exist_ok=True)
-            
             if not os.path.exists(self.file_path):
                 logger.warning(f"File not found: {self.file_path}")
                 return []
 
-            async with aiofiles.open(self.file_path, 'r', encoding='utf-8') as f:
+            async with aiofiles.open(self.file_path, 'rb') as f:
                 content = await f.read()
-                return json.loads(content) if content else []
+                if not content:
+                    return []
+                return orjson.loads(content) if orjson else json.loads(content)
 
         except Exception as e:
             logger.error(f"Error loading file {self.file_path}: {e}")
@@ -155,11 +453,13 @@ class FileHandler:
     async def save(self, data: List[Dict]) -> None:
         """Save JSON data to file"""
         try:
-            # Ensure directory exists
-            os.makedirs(self.directory, exist_ok=True)
-            
-            async with aiofiles.open(self.file_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(data, indent=2))
+            if orjson:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                payload = json.dumps(data, indent=2).encode('utf-8')
+
+            async with aiofiles.open(self.file_path, 'wb') as f:
+                await f.write(payload)
                 logger.info(f"Data saved to {self.file_path}")
 
         except Exception as e:
@@ -199,15 +499,17 @@ class PlaylistManager:
             self._spotify = await ClientManager.get_spotify()
         return self._spotify
 
-    @RateLimiter(max_calls=100, time_period=60)
+    @RateLimiter(max_calls=100, time_period=60, cache=False)
     async def create_playlist(self, name: str, description: str = "") -> str:
         """Create a new playlist with rate limiting and caching"""
         try:
             spotify = await self._get_spotify()
-            user_id = spotify.current_user()['id']
+            user = await spotify_throttle.call(spotify.current_user)
+            user_id = user['id']
             
             async with self._lock:
-                playlist = spotify.user_playlist_create(
+                playlist = await spotify_throttle.call(
+                    spotify.user_playlist_create,
                     user=user_id,
                     name=name,
                     public=True,
@@ -218,7 +520,7 @@ class PlaylistManager:
             logger.error(f"Error creating playlist '{name}': {e}")
             raise
 
-    @RateLimiter(max_calls=100, time_period=60)
+    @RateLimiter(max_calls=100, time_period=60, cache=False)
     async def add_tracks(self, playlist_id: str, track_uris: List[str]) -> None:
         """Add tracks to playlist with batching and rate limiting"""
         if not track_uris:
@@ -226,12 +528,11 @@ class PlaylistManager:
 
         try:
             spotify = await self._get_spotify()
-            
-            for i in range(0, len(track_uris), self.batch_size):
-                batch = track_uris[i:i + self.batch_size]
-                async with self._lock:
-                    spotify.playlist_add_items(playlist_id, batch)
-                await asyncio.sleep(0.1)  # Prevent rate limiting
+
+            # Batches are appended in the order they arrive, so send them one at a time to keep
+            # the playlist in track order; rate limiting is handled by spotify_throttle
+            for batch in _chunks(track_uris, self.batch_size):
+                await spotify_throttle.call(spotify.playlist_add_items, playlist_id, batch)
                 logger.debug(f"Added batch of {len(batch)} tracks to playlist {playlist_id}")
         except Exception as e:
             logger.error(f"Error adding tracks to playlist {playlist_id}: {e}")
@@ -242,6 +543,7 @@ class SpotifySearchManager:
     def __init__(self):
         self._lock = AsyncLock()
         self._cache = TTLCache(maxsize=1000, ttl=CACHE_TTL)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
         self._spotify = None
 
     async def _get_spotify(self):
@@ -252,50 +554,102 @@ class SpotifySearchManager:
     @RateLimiter(max_calls=100, time_period=60)
     async def search_album(self, artist: str, album: str) -> Optional[str]:
         """Search for album with caching and rate limiting"""
-        cache_key = f"{artist}:{album}"
+        cache_key = (artist, album)
         
         if cache_key in self._cache:
             return self._cache[cache_key]
 
+        # Join a lookup already in flight for the same album instead of searching twice
+        async with self._lock:
+            if cache_key in self._inflight:
+                future = self._inflight[cache_key]
+                owner = False
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[cache_key] = future
+                owner = True
+        if not owner:
+            return await future
+
+        album_id = None
+        try:
+            album_id = await self._lookup_album(artist, album)
+            self._cache[cache_key] = album_id
+        except Exception as e:
+            logger.error(f"Error searching for album '{album}' by '{artist}': {e}")
+        finally:
+            # Waiters get None on failure or cancellation, matching an uncached miss
+            future.set_result(album_id)
+            async with self._lock:
+                del self._inflight[cache_key]
+        return album_id
+
+    async def _lookup_album(self, artist: str, album: str) -> Optional[str]:
+        """Run the exact then fuzzy album search against Spotify"""
         spotify = await self._get_spotify()
         
         # Clean search terms
-        artist = artist.replace('$', 's').replace('/', ' ').strip()
-        album = album.replace('/', ' ').strip()
+        artist = artist.translate(_ARTIST_TRANS).strip()
+        album = album.translate(_ALBUM_TRANS).strip()
         
-        async with self._lock:
-            try:
-                # Try exact search first
-                query = f'album:"{album}" artist:"{artist}"'
-                results = spotify.search(q=query, type='album', limit=1)
-                
-                if results and results['albums']['items']:
-                    album_id = results['albums']['items'][0]['id']
-                    self._cache[cache_key] = album_id
-                    return album_id
-                
-                # Try fuzzy search
-                query = f'"{artist}" "{album}"'
-                results = spotify.search(q=query, type='album', limit=1)
-                
-                if results and results['albums']['items']:
-                    album_id = results['albums']['items'][0]['id']
-                    self._cache[cache_key] = album_id
-                    return album_id
-                
-                self._cache[cache_key] = None
-                return None
-                
-            except Exception as e:
-                logger.error(f"Error searching for album '{album}' by '{artist}': {e}")
-                return None
+        # Try exact search first
+        query = f'album:"{album}" artist:"{artist}"'
+        results = await spotify_throttle.call(spotify.search, q=query, type='album', limit=1)
+        
+        if results and results['albums']['items']:
+            return results['albums']['items'][0]['id']
+        
+        # Try fuzzy search
+        query = f'"{artist}" "{album}"'
+        results = await spotify_throttle.call(spotify.search, q=query, type='album', limit=1)
+        
+        if results and results['albums']['items']:
+            return results['albums']['items'][0]['id']
+        
+        return None
+
+    async def fetch_albums_bulk(self, ids: List[str]) -> Dict[str, dict]:
+        """Fetch full album objects 20 at a time, cached by album ID in spotify_cache.
+        Albums that could not be fetched are omitted."""
+        albums = {}
+        missing = []
+        for album_id in dict.fromkeys(ids):
+            cached = spotify_cache.get(('album', album_id))
+            if cached is not None:
+                albums[album_id] = cached
+            else:
+                missing.append(album_id)
+        if not missing:
+            return albums
+
+        spotify = await self._get_spotify()
+        semaphore = asyncio.Semaphore(SPOTIFY_CONCURRENCY)
+
+        async def fetch(chunk: List[str]):
+            async with semaphore:
+                return await spotify_throttle.call(spotify.albums, chunk)
+
+        chunks = list(_chunks(missing, 20))
+        responses = await asyncio.gather(*(fetch(chunk) for chunk in chunks), return_exceptions=True)
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"Error fetching albums {chunk}: {response}")
+                continue
+            for album_id, album_info in zip(chunk, response['albums']):
+                if album_info:
+                    albums[album_id] = spotify_cache[('album', album_id)] = album_info
+        return albums
 
 class WebContentExtractor:
     """Handles web content extraction with improved efficiency"""
-    def __init__(self):
+    def __init__(self, max_pages: int = 10):
         self._lock = AsyncLock()
+        self._page_slots = asyncio.Semaphore(max_pages)
         self._playwright = None
         self._browser = None
+        self._context = None
+        # Hosts whose pages needed a browser, so later URLs skip the plain HTTP attempt
+        self._browser_hosts = set()
 
     async def __aenter__(self):
         return self
@@ -320,8 +674,38 @@ class WebContentExtractor:
                 ]
             )
 
+            # One context is shared by every page, so its setup is paid once
+            self._context = await self._browser.new_context(
+                viewport={'width': 1920, 'height': 1080},
+                user_agent=_BROWSER_USER_AGENT,
+                java_script_enabled=True
+            )
+            
+            # Add stealth mode scripts
+            await self._context.add_init_script("""
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                });
+            """)
+            
+            await self._context.set_extra_http_headers(_BROWSER_HEADERS)
+
+            # Only page text is used, so skip downloading assets that don't affect it
+            await self._context.route("**/*", self._block_static_assets)
+
+    @staticmethod
+    async def _block_static_assets(route):
+        """Abort requests for resource types that never reach the extracted text"""
+        if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
     async def cleanup(self):
         """Clean up Playwright resources"""
+        if self._context:
+            await self._context.close()
+            self._context = None
         if self._browser:
             await self._browser.close()
             self._browser = None
@@ -329,38 +713,67 @@ class WebContentExtractor:
             await self._playwright.stop()
             self._playwright = None
 
-    async def extract_content(self, url: str) -> str:
-        """Extract content from webpage with improved error handling"""
-        if not self._browser:
-            await self.setup()
+    async def _fetch_static(self, url: str) -> Optional[str]:
+        """Fetch a page over plain HTTP; None if the fetch failed or did not return HTML"""
+        try:
+            session = await ClientManager.get_session()
+            async with session.get(url, headers=_STATIC_HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status != 200 or 'html' not in response.content_type:
+                    return None
+                html_content = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError) as e:
+            logger.debug(f"Static fetch failed for {url}: {e}")
+            return None
+        return html_content
+
+    @staticmethod
+    def _has_main_content(html_content: str) -> bool:
+        """Whether server-rendered HTML already contains the article text"""
+        try:
+            doc = parse_html(html_content)
+        except (etree.ParserError, ValueError):
+            return False
+        return any(len(el.text_content().strip()) >= STATIC_MIN_TEXT
+                   for xpath in _STATIC_CONTENT_XPATHS for el in xpath(doc))
+
+    async def extract_content(self, url: str, links_only: bool = False) -> str:
+        """Extract content from webpage with improved error handling.
+        With links_only, a page is good enough once it contains a Spotify album link.
+        Pages are cached in page_cache so rescanning a page skips the fetch; link scans
+        use their own ('links', url) key since their static pages may lack the article text."""
+        cache_key = ('links', url) if links_only else url
+        if cache_key in page_cache:
+            logger.debug(f"Using cached content for {url}")
+            return page_cache[cache_key]
+
+        # Most pages are server-rendered, so try a plain HTTP fetch before starting a browser
+        host = urlparse(url).netloc.lower()
+        if host not in self._browser_hosts:
+            html_content = await self._fetch_static(url)
+            if html_content is not None:
+                if links_only:
+                    # Links may be injected by scripts, so a static page without any needs the browser
+                    if _SPOTIFY_ALBUM_RE.search(html_content):
+                        logger.debug(f"Fetched Spotify links from {url} without a browser")
+                        page_cache[cache_key] = html_content
+                        return html_content
+                elif self._has_main_content(html_content):
+                    logger.debug(f"Fetched {url} without a browser")
+                    page_cache[cache_key] = html_content
+                    return html_content
+                # The site answered but needs rendering; a failed fetch may just be a transient error
+                self._browser_hosts.add(host)
 
-        async with self._lock:
+        if self._context is None:
+            async with self._lock:
+                if self._context is None:
+                    await self.setup()
+
+        # Pages are independent, so fetches run concurrently up to max_pages
+        async with self._page_slots:
             try:
-                context = await self._browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    java_script_enabled=True
-                )
-                
-                # Add stealth mode scripts
-                await context.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                """)
-                
-                page = await context.new_page()
+                page = await self._context.new_page()
                 try:
-                    # Configure page
-                    await page.set_extra_http_headers({
-                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                        "Accept-Language": "en-US,en;q=0.5",
-                        "Accept-Encoding": "gzip, deflate, br",
-                        "DNT": "1",
-                        "Connection": "keep-alive",
-                        "Upgrade-Insecure-Requests": "1"
-                    })
-                    
                     # Navigate with more lenient conditions
                     response = await page.goto(url, wait_until='domcontentloaded', timeout=30000)
                     if not response:
@@ -378,45 +791,36 @@ class WebContentExtractor:
                     # Log a sample for debugging
                     logger.debug(f"HTML sample: {html_content[:1000]}")
                     
+                    # A rendered page serves both link scans and GPT scans
+                    page_cache[url] = page_cache[('links', url)] = html_content
                     return html_content
                     
                 finally:
                     await page.close()
-                    await context.close()
                     
             except Exception as e:
                 logger.error(f"Error extracting content from {url}: {e}")
                 raise
 
 def get_next_log_number() -> int:
-    """Get the next available log file number (0-9) with improved efficiency"""
-    log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logfiles")
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Use list comprehension for better performance
-    log_files = [(os.path.getmtime(os.path.join(log_dir, f"spotscraper{i}.log")), i) 
-                 for i in range(10) 
-                 if os.path.exists(os.path.join(log_dir, f"spotscraper{i}.log"))]
+    """Get the next log file number (0-9), rotating through them via a counter file"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    counter_path = os.path.join(LOG_DIR, ".next")
     
-    if not log_files:
-        return 0
-    
-    if len(log_files) == 10:
-        return min(log_files, key=lambda x: x[0])[1]
+    try:
+        with open(counter_path) as f:
+            log_number = int(f.read()) % 10
+    except (OSError, ValueError):
+        log_number = 0
     
-    used_numbers = {i for _, i in log_files}
-    return next(i for i in range(10) if i not in used_numbers)
+    with open(counter_path, 'w') as f:
+        f.write(str((log_number + 1) % 10))
+    return log_number
 
 def setup_logging():
     """Set up logging with improved configuration"""
-    log_dir = os.path.normpath(os.path.join(
-        os.path.dirname(os.path.abspath(__file__)), 
-        "logfiles"
-    ))
-    os.makedirs(log_dir, exist_ok=True)
-    
     log_number = get_next_log_number()
-    log_file = os.path.normpath(os.path.join(log_dir, f"spotscraper{log_number}.log"))
+    log_file = os.path.join(LOG_DIR, f"spotscraper{log_number}.log")
     
     # Delete the existing log file if it exists
     if os.path.exists(log_file):
@@ -445,11 +849,21 @@ def setup_logging():
         console_handler.setLevel(logging.WARNING)
         console_handler.setFormatter(simple_formatter)
         
+        # Batch records in memory and write them out together; warnings and errors flush immediately
+        file_buffer = MemoryHandler(capacity=512, flushLevel=logging.WARNING, target=file_handler)
+        file_buffer.setLevel(logging.DEBUG)
+        
+        # File writes happen on a listener thread so logging never blocks the event loop
+        log_queue = queue.SimpleQueue()
+        file_listener = QueueListener(log_queue, file_buffer, respect_handler_level=True)
+        file_listener.start()
+        atexit.register(file_listener.stop)
+        
         # Configure root logger
         root_logger = logging.getLogger()
         root_logger.setLevel(logging.DEBUG)
         root_logger.handlers.clear()
-        root_logger.addHandler(file_handler)
+        root_logger.addHandler(QueueHandler(log_queue))
         root_logger.addHandler(console_handler)
         
         # Get module loggers
@@ -471,36 +885,63 @@ def user_message(msg: str, log_only: bool = False):
         print(msg)
     logger.info(f"USER: {msg}")
 
+async def user_input(prompt: str = "") -> str:
+    """Read a line from the user without blocking the event loop.
+    The read runs on a daemon thread so an abandoned prompt never delays exit."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result=None, error=None):
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def read():
+        try:
+            result, error = input(prompt), None
+        except BaseException as e:
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(resolve, result, error)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+    Thread(target=read, daemon=True).start()
+    return await future
+
+def parse_html(content: str):
+    """Parse an HTML string with lxml, dropping any XML declaration lxml rejects in str input"""
+    return lxml_html.document_fromstring(_XML_DECL_RE.sub('', content, count=1), parser=_HTML_PARSER)
+
 def clean_html_content(content: str) -> str:
     """Clean HTML content to extract only relevant text for music information"""
     try:
-        # Create BeautifulSoup object with lxml parser
-        soup = BeautifulSoup(content, 'lxml')
+        tree = parse_html(content)
         
         # Remove script, style, meta, link, and other non-content tags
-        for element in soup.find_all(['script', 'style', 'meta', 'link', 'noscript', 'iframe', 'svg', 
-                                    'path', 'button', 'input', 'form', 'nav', 'footer', 'header']):
-            element.decompose()
+        etree.strip_elements(tree, *_STRIP_TAGS, with_tail=False)
             
         # Focus on main content areas
         main_content = None
-        for selector in ['main', 'article', '[role="main"]', '.article__body', '.content', '#content']:
-            main_content = soup.select_one(selector)
-            if main_content:
+        for xpath in _MAIN_CONTENT_XPATHS:
+            matches = xpath(tree)
+            if matches:
+                main_content = matches[0]
                 break
                 
-        if main_content:
-            # Extract text from main content
-            text = main_content.get_text(separator=' ', strip=True)
-        else:
+        if main_content is None:
             # Fallback to body if no main content found
-            text = soup.body.get_text(separator=' ', strip=True) if soup.body else soup.get_text(separator=' ', strip=True)
+            main_content = tree.find('body')
+            if main_content is None:
+                main_content = tree
+            
+        text = ' '.join(part.strip() for part in main_content.itertext() if part.strip())
             
         # Clean up the text
-        # Remove multiple spaces and newlines
-        text = re.sub(r'\s+', ' ', text)
-        # Remove non-breaking spaces and other special whitespace
-        text = text.replace('\xa0', ' ').strip()
+        # Collapse multiple spaces, newlines and non-breaking spaces
+        text = _WS_RE.sub(' ', text).strip()
         
         return text
         
@@ -508,16 +949,91 @@ def clean_html_content(content: str) -> str:
         logger.error(f"Error cleaning HTML content: {e}")
         return content
 
-async def process_with_gpt(content: str) -> str:
-    """Process content with GPT with improved content filtering and prompting"""
+def chunk_text(text: str, size: int) -> Generator[str, None, None]:
+    """Split text into chunks of at most size characters on space boundaries"""
+    start, length = 0, len(text)
+    while start < length:
+        end = min(start + size, length)
+        if end < length:
+            # Back up to the last space so words are not split
+            split = text.rfind(' ', start, end)
+            if split > start:
+                end = split
+        chunk = text[start:end].strip()
+        if chunk:
+            yield chunk
+        start = end
+
+def chunk_tokens(text: str, encoding, size: int) -> Generator[str, None, None]:
+    """Split text into chunks of at most size tokens on space boundaries"""
+    # Page text may contain special-token strings like <|endoftext|>; treat them as plain text
+    tokens = encoding.encode_ordinary(text)
+    _, offsets = encoding.decode_with_offsets(tokens)
+    offsets.append(len(text))
+    start, start_token = 0, 0
+    while start_token < len(tokens):
+        end_token = min(start_token + size, len(tokens))
+        end = offsets[end_token]
+        if end_token < len(tokens):
+            # Back up to the last space so words are not split
+            split = text.rfind(' ', start, end)
+            if split > start:
+                end = split
+                end_token = max(bisect.bisect_right(offsets, end) - 1, start_token + 1)
+        chunk = text[start:end].strip()
+        if chunk:
+            yield chunk
+        start, start_token = end, end_token
+
+@lru_cache(maxsize=None)
+def get_token_encoding(model: str):
+    """Return the tiktoken encoding for model, or None if it is unavailable.
+    The result is cached, including failures, since loading may download the encoding file."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        logger.warning(f"Could not load token encoding for {model}, chunking by characters: {e}")
+        return None
+
+async def process_with_gpt(content: str, on_result: Optional[Callable[[str], None]] = None) -> str:
+    """Process content with GPT with improved content filtering and prompting.
+    Responses are streamed; on_result is called with each new 'Artist - Album' pair as soon as it arrives.
+    The returned pairs are in page order, whatever order the chunks finished in."""
     try:
         # Clean the content first
         cleaned_content = clean_html_content(content)
         logger.debug(f"Cleaned content sample: {cleaned_content[:500]}")
         
         openai_client = await ClientManager.get_openai()
-        chunks = textwrap.wrap(cleaned_content, 4000, break_long_words=False, break_on_hyphens=False)
-        all_results = []
+        model = "gpt-4"
+        encoding = await asyncio.to_thread(get_token_encoding, model)
+        if encoding:
+            chunks = list(chunk_tokens(cleaned_content, encoding, GPT_CHUNK_TOKENS))
+        else:
+            chunks = list(chunk_text(cleaned_content, 4000))
+        # Chunks finish in any order, so each pair keeps the earliest page position it was seen at
+        positions = {}
+        rejected = set()
+
+        def add_lines(i: int, text: str, line_nos: Iterator[int]):
+            # Additional filtering of results
+            for match in _LINE_RE.finditer(text):
+                line = match.group().strip()
+                position = (i, next(line_nos))
+                if line in positions:
+                    positions[line] = min(positions[line], position)
+                    continue
+                if line in rejected:
+                    continue
+                lowered = line.lower()
+                if ' - ' in line and not any(x in lowered for x in _EXCLUDED_RESULT_WORDS):
+                    positions[line] = position
+                    if on_result:
+                        on_result(line)
+                else:
+                    rejected.add(line)
         
         system_prompt = """You are a precise music information extractor. Your task is to identify and extract ONLY artist and album pairs from the provided text.
 
@@ -538,116 +1054,218 @@ async def process_with_gpt(content: str) -> str:
         The Beatles - Abbey Road
         Pink Floyd - The Dark Side of the Moon"""
         
-        for i, chunk in enumerate(chunks, 1):
+        semaphore = asyncio.Semaphore(GPT_CONCURRENCY)
+
+        async def process_chunk(i: int, chunk: str):
+            line_nos = itertools.count()
             try:
                 messages = [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": f"Extract artist-album pairs from this text. Ignore any non-music content:\n\n{chunk}"}
                 ]
+
+                cache_key = gpt_cache.make_key(model, system_prompt, messages[1]["content"])
+                cached = gpt_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug(f"Using cached GPT response for chunk {i}")
+                    add_lines(i, cached, line_nos)
+                    return
                 
-                response = await openai_client.chat.completions.create(
-                    model="gpt-4",
-                    messages=messages,
-                    temperature=0.1,
-                    max_tokens=2000
-                )
-                
-                result = response.choices[0].message.content.strip()
-                if result:
-                    # Additional filtering of results
-                    valid_pairs = []
-                    for line in result.split('\n'):
-                        line = line.strip()
-                        if ' - ' in line and not any(x in line.lower() for x in ['ep', 'single', 'remix', 'feat.']):
-                            valid_pairs.append(line)
-                    all_results.extend(valid_pairs)
+                async with semaphore:
+                    stream = await openai_client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=0.1,
+                        max_tokens=2000,
+                        stream=True
+                    )
+                    
+                    # Handle each complete line as soon as it has streamed in
+                    buffer = ''
+                    parts = []
+                    async for event in stream:
+                        if not event.choices:
+                            continue
+                        delta = event.choices[0].delta.content or ''
+                        parts.append(delta)
+                        buffer += delta
+                        end = buffer.rfind('\n')
+                        if end != -1:
+                            add_lines(i, buffer[:end], line_nos)
+                            buffer = buffer[end + 1:]
+                    add_lines(i, buffer, line_nos)
+
+                gpt_cache.set(cache_key, ''.join(parts))
                 
             except Exception as e:
                 logger.error(f"Error processing chunk {i}: {e}")
-                continue
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        final_results = [item for item in all_results if item and item not in seen and not seen.add(item)]
+
+        # Send all chunks concurrently, then put the results back in page order
+        await asyncio.gather(*(process_chunk(i, chunk) for i, chunk in enumerate(chunks, 1)))
         
-        return '\n'.join(final_results)
+        return '\n'.join(sorted(positions, key=positions.get))
         
     except Exception as e:
         logger.error(f"Error in GPT processing: {e}")
         raise
 
+def _chunks(seq: List[Any], size: int) -> Generator[List[Any], None, None]:
+    """Yield successive slices of at most size items"""
+    return (seq[i:i + size] for i in range(0, len(seq), size))
+
+async def fetch_tracks(spotify: spotipy.Spotify, track_ids: List[str]) -> Dict[str, Dict]:
+    """Fetch full track objects 50 at a time, cached by track ID in spotify_cache.
+    Returns track_id -> track; tracks that could not be fetched are omitted."""
+    tracks = {}
+    missing = []
+    for track_id in dict.fromkeys(track_ids):
+        cached = spotify_cache.get(('track', track_id))
+        if cached is not None:
+            tracks[track_id] = cached
+        else:
+            missing.append(track_id)
+
+    semaphore = asyncio.Semaphore(SPOTIFY_CONCURRENCY)
+
+    async def fetch(chunk: List[str]):
+        async with semaphore:
+            return await spotify_throttle.call(spotify.tracks, chunk)
+
+    chunks = list(_chunks(missing, 50))
+    responses = await asyncio.gather(*(fetch(chunk) for chunk in chunks), return_exceptions=True)
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, Exception):
+            logger.warning(f"Error fetching tracks {chunk}: {response}")
+            continue
+        for track_id, track in zip(chunk, response['tracks']):
+            if track:
+                tracks[track_id] = spotify_cache[('track', track_id)] = track
+    return tracks
+
+async def fetch_album_details(spotify: spotipy.Spotify, album_ids: List[str]) -> Dict[str, Tuple[Dict, List[Dict]]]:
+    """Fetch album info and per-track popularity using Spotify's multi-get endpoints.
+    Returns album_id -> (album_info, tracks); albums that could not be fetched are omitted.
+    Results are cached by album ID in spotify_cache."""
+    # Only fetch albums that are not already cached
+    details = {}
+    missing = []
+    for album_id in dict.fromkeys(album_ids):
+        cached = spotify_cache.get(('album_details', album_id))
+        if cached is not None:
+            details[album_id] = cached
+        else:
+            missing.append(album_id)
+
+    # Get album info (up to 20 albums per request)
+    search_manager = await ClientManager.get_search_manager()
+    albums = await search_manager.fetch_albums_bulk(missing)
+
+    # Get track details including popularity (up to 50 tracks per request)
+    track_info = await fetch_tracks(spotify, [track['id'] for album_info in albums.values()
+                                              for track in album_info['tracks']['items'] if track.get('id')])
+
+    for album_id, album_info in albums.items():
+        tracks = []
+        for item in album_info['tracks']['items']:
+            track = track_info.get(item.get('id'))
+            if track:
+                tracks.append({
+                    'name': track['name'],
+                    'popularity': track.get('popularity', 0)
+                })
+        details[album_id] = spotify_cache[('album_details', album_id)] = (album_info, tracks)
+
+    return details
+
+async def get_album_tracks(spotify: spotipy.Spotify, album_id: str) -> List[Dict]:
+    """Get every track on an album, following pagination, cached by album ID in spotify_cache"""
+    cache_key = ('album_tracks', album_id)
+    album_tracks = spotify_cache.get(cache_key)
+    if album_tracks is None:
+        page = await spotify_throttle.call(spotify.album_tracks, album_id, limit=50)
+        album_tracks = list(page['items'])
+        while page and page.get('next'):
+            page = await spotify_throttle.call(spotify.next, page)
+            if page:
+                album_tracks.extend(page['items'])
+        spotify_cache[cache_key] = album_tracks
+    return album_tracks
+
 class ContentProcessor:
     """Handles content processing with improved efficiency"""
     def __init__(self):
-        self._extractor = WebContentExtractor()
-        self._search_manager = SpotifySearchManager()
-        self._playlist_manager = PlaylistManager()
         self._file_handler = None
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self._extractor.cleanup()
+        # The shared extractor is released by ClientManager.cleanup
+        pass
 
-    async def process_url(self, url: str, destination_file: str) -> None:
-        """Process URL and save results with improved error handling"""
+    async def process_url(self, url: str, destination_file: str) -> bool:
+        """Process URL and save results with improved error handling. Returns True if entries were saved."""
         try:
             # Initialize file handler
             self._file_handler = FileHandler(destination_file)
+
+            # Authenticate with Spotify while the page is fetched and read by GPT
+            spotify_task = asyncio.create_task(ClientManager.get_spotify())
             
             # Extract content
-            content = await self._extractor.extract_content(url)
+            extractor = await ClientManager.get_extractor()
+            content = await extractor.extract_content(url)
             
-            # Process with GPT
-            gpt_results = await process_with_gpt(content)
+            # Process with GPT, searching for each album as soon as GPT reports it
+            search_manager = await ClientManager.get_search_manager()
+            searches = []
+
+            def start_search(line: str):
+                artist, album = (part.strip() for part in line.split(' - ', 1))
+                task = asyncio.create_task(search_manager.search_album(artist, album))
+                searches.append((line, artist, album, task))
+
+            results = await process_with_gpt(content, on_result=start_search)
+            # Searches started in arrival order; report albums in the order they appear on the page
+            page_order = {line: n for n, line in enumerate(results.splitlines())}
+            searches.sort(key=lambda search: page_order[search[0]])
             
-            new_entries = []
+            scan_ts = datetime.now().isoformat()
             user_message("\nProcessing found albums...")
             
-            # Process each result
-            for line in gpt_results.split('\n'):
-                if ' - ' not in line:
-                    continue
-                    
-                try:
-                    artist, album = line.split(' - ', 1)
-                    album_id = await self._search_manager.search_album(artist.strip(), album.strip())
-                    
-                    if album_id:
-                        # Get album info including popularity
-                        spotify = await ClientManager.get_spotify()
-                        album_info = spotify.album(album_id)
-                        album_popularity = album_info.get('popularity', 0)
-
-                        # Get track info with popularity
-                        tracks = []
-                        track_results = spotify.album_tracks(album_id)
-                        track_ids = [track['id'] for track in track_results['items']]
-                        
-                        # Get track details including popularity (in batches of 50)
-                        for i in range(0, len(track_ids), 50):
-                            batch_ids = track_ids[i:i+50]
-                            batch_tracks = spotify.tracks(batch_ids)['tracks']
-                            for track in batch_tracks:
-                                if track:
-                                    tracks.append({
-                                        'name': track['name'],
-                                        'popularity': track.get('popularity', 0)
-                                    })
-
-                        new_entries.append({
-                            "Artist": artist.strip(),
-                            "Album": album.strip(),
-                            "Album Popularity": album_popularity,
-                            "Tracks": tracks,
-                            "Spotify Link": f"spotify:album:{album_id}",
-                            "Extraction Date": datetime.now().isoformat()
-                        })
-                        
-                except ValueError as e:
-                    logger.warning(f"Error processing line '{line}': {e}")
-                    continue
+            # Collect the Spotify album for each result
+            album_ids = await asyncio.gather(*(task for _, _, _, task in searches), return_exceptions=True)
+            found = []
+            found_ids = set()
+            for (_, artist, album, _), album_id in zip(searches, album_ids):
+                if isinstance(album_id, Exception):
+                    logger.warning(f"Error searching for '{artist} - {album}': {album_id}")
+                elif album_id in found_ids:
+                    # Different spellings can resolve to the same Spotify album
+                    logger.debug(f"Skipping duplicate album {album_id} for '{artist} - {album}'")
+                elif album_id:
+                    found_ids.add(album_id)
+                    found.append((artist, album, album_id))
+
+            # Fetch album and track details in batches
+            spotify = await spotify_task
+            details = await fetch_album_details(spotify, [album_id for _, _, album_id in found])
+
+            for _, _, album_id in found:
+                if album_id not in details:
+                    logger.warning(f"Could not fetch details for album ID {album_id}")
+
+            new_entries = [
+                {
+                    "Artist": artist,
+                    "Album": album,
+                    "Album Popularity": details[album_id][0].get('popularity', 0),
+                    "Tracks": details[album_id][1],
+                    "Spotify Link": f"spotify:album:{album_id}",
+                    "Extraction Date": scan_ts
+                }
+                for artist, album, album_id in found if album_id in details
+            ]
             
             # Review and save results if we have new entries
             if new_entries:
@@ -656,8 +1274,10 @@ class ContentProcessor:
                     # If user chose to exit to main menu or cancel, remove the file if it exists
                     if os.path.exists(destination_file):
                         os.remove(destination_file)
+                return saved
             else:
                 user_message("No entries found to save")
+                return False
                 
         except Exception as e:
             logger.error(f"Error processing URL {url}: {e}")
@@ -729,7 +1349,7 @@ async def review_and_save_results(entries: List[Dict], destination_file: str) ->
         user_message("3. Cancel")
         user_message("4. Exit to main menu")
         
-        choice = input("Choose (1-4): ").strip()
+        choice = (await user_input("Choose (1-4): ")).strip()
         
         if choice == "1":
             file_handler = FileHandler(destination_file)
@@ -737,7 +1357,7 @@ async def review_and_save_results(entries: List[Dict], destination_file: str) ->
             user_message(f"Saved {len(entries)} entries to {destination_file}")
             return True
         elif choice == "2":
-            entry_num = input("Enter the number of the entry to delete (or 'b' to go back): ").strip()
+            entry_num = (await user_input("Enter the number of the entry to delete (or 'b' to go back): ")).strip()
             if entry_num.lower() == 'b':
                 continue
             try:
@@ -760,87 +1380,55 @@ async def review_and_save_results(entries: List[Dict], destination_file: str) ->
 
 async def scan_spotify_links(url: str, destination_file: str) -> None:
     """Scan webpage for Spotify links and add artist and album data to JSON"""
-    extractor = WebContentExtractor()
     try:
         # Initialize file handler
         file_handler = FileHandler(destination_file)
 
         # Extract content
-        content = await extractor.extract_content(url)
+        extractor = await ClientManager.get_extractor()
+        content = await extractor.extract_content(url, links_only=True)
         
         # Log a sample of the content for debugging
         content_sample = content[:1000]
         logger.debug(f"Content sample: {content_sample}")
         
-        # Enhanced regex pattern to capture various Spotify album link formats
-        spotify_patterns = [
-            r'spotify:album:([a-zA-Z0-9]{22})',  # URI format
-            r'open\.spotify\.com/album/([a-zA-Z0-9]{22})',  # Web URL format
-            r'spotify\.com/album/([a-zA-Z0-9]{22})',  # Alternative web URL format
-            r'href="[^"]*?/album/([a-zA-Z0-9]{22})',  # href attribute format
-            r'data-uri="spotify:album:([a-zA-Z0-9]{22})',  # data-uri attribute format
-            r'/album/([a-zA-Z0-9]{22})',  # Simple album ID format
-        ]
-        
         # Collect all unique album IDs
         album_ids = set()
-        for pattern in spotify_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                # Extract the album ID from the capturing group
-                album_id = match.group(1)
-                if album_id and len(album_id) == 22:  # Spotify IDs are 22 characters
-                    album_ids.add(album_id)
-                    logger.debug(f"Found album ID: {album_id} using pattern: {pattern}")
+        for match in _SPOTIFY_ALBUM_RE.finditer(content):
+            album_id = match.group(1)
+            if album_id not in album_ids:
+                album_ids.add(album_id)
+                logger.debug(f"Found album ID: {album_id} in: {match.group(0)}")
 
         user_message(f"\nFound {len(album_ids)} unique Spotify album links")
         if not album_ids:
             logger.warning("No Spotify album links found in the content")
             return
 
-        new_entries = []
+        scan_ts = datetime.now().isoformat()
         spotify = await ClientManager.get_spotify()
         user_message("Processing found albums...")
 
-        # Process each album ID
-        for album_id in album_ids:
-            try:
-                # Get album info
-                album_info = spotify.album(album_id)
-                artist = album_info['artists'][0]['name']
-                album = album_info['name']
-                album_popularity = album_info.get('popularity', 0)
-
-                # Get track info
-                tracks = []
-                track_results = spotify.album_tracks(album_id)
-                track_ids = [track['id'] for track in track_results['items']]
-                
-                # Get track details including popularity (in batches of 50)
-                for i in range(0, len(track_ids), 50):
-                    batch_ids = track_ids[i:i+50]
-                    batch_tracks = spotify.tracks(batch_ids)['tracks']
-                    for track in batch_tracks:
-                        if track:
-                            tracks.append({
-                                'name': track['name'],
-                                'popularity': track.get('popularity', 0)
-                            })
-
-                new_entry = {
-                    "Artist": artist,
-                    "Album": album,
-                    "Album Popularity": album_popularity,
-                    "Tracks": tracks,
-                    "Spotify Link": f"spotify:album:{album_id}",
-                    "Extraction Date": datetime.now().isoformat()
-                }
-
-                new_entries.append(new_entry)
+        # Fetch album and track details in batches
+        album_ids = list(album_ids)
+        details = await fetch_album_details(spotify, album_ids)
 
-            except Exception as e:
-                logger.warning(f"Error processing album ID {album_id}: {e}")
-                continue
+        for album_id in album_ids:
+            if album_id not in details:
+                logger.warning(f"Could not fetch details for album ID {album_id}")
+
+        new_entries = [
+            {
+                "Artist": album_info['artists'][0]['name'],
+                "Album": album_info['name'],
+                "Album Popularity": album_info.get('popularity', 0),
+                "Tracks": tracks,
+                "Spotify Link": f"spotify:album:{album_id}",
+                "Extraction Date": scan_ts
+            }
+            for album_id in album_ids if album_id in details
+            for album_info, tracks in (details[album_id],)
+        ]
 
         if new_entries:
             # Review and edit entries before saving
@@ -850,7 +1438,7 @@ async def scan_spotify_links(url: str, destination_file: str) -> None:
                 user_message("\nWould you like to create a Spotify playlist with these albums?")
                 user_message("1. Yes")
                 user_message("2. No")
-                choice = input("Choose (1-2): ").strip()
+                choice = (await user_input("Choose (1-2): ")).strip()
                 
                 if choice == "1":
                     await create_playlist(destination_file)
@@ -860,34 +1448,25 @@ async def scan_spotify_links(url: str, destination_file: str) -> None:
     except Exception as e:
         logger.error(f"Error scanning Spotify links from {url}: {e}")
         raise
-    finally:
-        # Ensure Playwright resources are cleaned up
-        await extractor.cleanup()
 
 async def scan_webpage(url: str, destination_file: str):
     """Scan webpage for music content and process with GPT"""
     try:
         processor = ContentProcessor()
-        await processor.process_url(url, destination_file)
+        saved = await processor.process_url(url, destination_file)
         
-        # If process_url returns (due to exit to main menu), we should also return
-        if not os.path.exists(destination_file):
+        # If nothing was saved (e.g. exit to main menu), we should also return
+        if not saved:
             return
             
-        # Load the results
-        file_handler = FileHandler(destination_file)
-        entries = await file_handler.load()
+        # Ask if user wants to create a playlist only if we have saved entries
+        user_message("\nWould you like to create a Spotify playlist with these albums?")
+        user_message("1. Yes")
+        user_message("2. No")
+        choice = (await user_input("Choose (1-2): ")).strip()
         
-        if entries:
-            # Ask if user wants to create a playlist only if we have saved entries
-            if os.path.exists(destination_file):
-                user_message("\nWould you like to create a Spotify playlist with these albums?")
-                user_message("1. Yes")
-                user_message("2. No")
-                choice = input("Choose (1-2): ").strip()
-                
-                if choice == "1":
-                    await create_playlist(destination_file)
+        if choice == "1":
+            await create_playlist(destination_file)
             
     except Exception as e:
         logger.error(f"Error processing webpage: {e}")
@@ -895,7 +1474,7 @@ async def scan_webpage(url: str, destination_file: str):
 
 async def create_playlist(json_file: str, playlist_name: str = None):
     """Create a Spotify playlist from JSON file"""
-    playlist_manager = PlaylistManager()
+    playlist_manager = await ClientManager.get_playlist_manager()
     file_handler = FileHandler(json_file)
     
     try:
@@ -908,15 +1487,15 @@ async def create_playlist(json_file: str, playlist_name: str = None):
         user_message("\nWhat type of playlist would you like to create?")
         user_message("1. All tracks from albums")
         user_message("2. Most popular track from each album (Sampler)")
-        playlist_type = input("Choose (1-2): ").strip()
+        playlist_type = (await user_input("Choose (1-2): ")).strip()
 
         # Then ask for playlist name
         if not playlist_name:
             default_name = "SpotScraper Sampler" if playlist_type == "2" else "SpotScraper Playlist"
             default_name += f" {datetime.now().strftime('%Y-%m-%d')}"
-            playlist_name = input(f"\nEnter playlist name (or press Enter for '{default_name}'): ").strip() or default_name
+            playlist_name = (await user_input(f"\nEnter playlist name (or press Enter for '{default_name}'): ")).strip() or default_name
 
-        playlist_description = input("\nEnter playlist description (or press Enter for default): ").strip()
+        playlist_description = (await user_input("\nEnter playlist description (or press Enter for default): ")).strip()
         
         # Modify description based on playlist type
         default_description = f"{playlist_name} - Created on {datetime.now().strftime('%Y-%m-%d')}"
@@ -930,38 +1509,61 @@ async def create_playlist(json_file: str, playlist_name: str = None):
 
         track_uris = []
         spotify = await ClientManager.get_spotify()
-        
+
+        # One entry per album, so repeated links never cost another lookup
+        album_entries = []
+        seen_albums = set()
         for entry in data:
-            if spotify_link := entry.get('Spotify Link'):
-                if 'spotify:album:' in spotify_link:
-                    album_id = spotify_link.split(':')[-1]
-                    album_tracks = spotify.album_tracks(album_id)
+            match = _SPOTIFY_ID_RE.search(entry.get('Spotify Link') or '')
+            if match and match.group(1) == 'album' and match.group(2) not in seen_albums:
+                seen_albums.add(match.group(2))
+                album_entries.append((entry, match.group(2)))
+
+        # Album objects embed their first page of tracks, so only longer albums need paging
+        search_manager = await ClientManager.get_search_manager()
+        albums = await search_manager.fetch_albums_bulk([album_id for _, album_id in album_entries])
+        semaphore = asyncio.Semaphore(SPOTIFY_CONCURRENCY)
+
+        async def fetch_album_tracks(album_id: str) -> List[Dict]:
+            album_info = albums.get(album_id)
+            if album_info and not album_info['tracks'].get('next'):
+                return album_info['tracks']['items']
+            async with semaphore:
+                return await get_album_tracks(spotify, album_id)
+
+        album_track_lists = await asyncio.gather(*(fetch_album_tracks(album_id) for _, album_id in album_entries))
+
+        # Sampler needs every track's popularity, which only full track objects carry
+        track_info = {}
+        if playlist_type == "2":
+            track_info = await fetch_tracks(spotify, [
+                track['id']
+                for (entry, _), album_tracks in zip(album_entries, album_track_lists) if 'Tracks' in entry
+                for track in album_tracks if track.get('id')
+            ])
+        
+        for (entry, album_id), album_tracks in zip(album_entries, album_track_lists):
+            if playlist_type == "2" and 'Tracks' in entry:
+                # Find the most popular track in the album
+                most_popular_track = None
+                highest_popularity = -1
+                
+                for track in album_tracks:
+                    popularity = track_info.get(track.get('id'), {}).get('popularity', 0)
                     
-                    if playlist_type == "2" and 'Tracks' in entry:
-                        # Find the most popular track in the album
-                        most_popular_track = None
-                        highest_popularity = -1
-                        
-                        # Get all tracks with their popularity scores
-                        tracks_with_popularity = []
-                        for track in album_tracks['items']:
-                            track_info = spotify.track(track['id'])
-                            popularity = track_info.get('popularity', 0)
-                            tracks_with_popularity.append((track, popularity))
-                            
-                            if popularity > highest_popularity:
-                                highest_popularity = popularity
-                                most_popular_track = track
-                        
-                        if most_popular_track:
-                            track_uris.append(most_popular_track['uri'])
-                            user_message(f"Added '{most_popular_track['name']}' (Popularity: {highest_popularity}) from {entry['Artist']} - {entry['Album']}")
-                    else:
-                        # Add all tracks from the album
-                        album_uris = [track['uri'] for track in album_tracks['items']]
-                        track_uris.extend(album_uris)
-
-        track_uris = list(set(track_uris))  # Remove any duplicates
+                    if popularity > highest_popularity:
+                        highest_popularity = popularity
+                        most_popular_track = track
+                
+                if most_popular_track:
+                    track_uris.append(most_popular_track['uri'])
+                    user_message(f"Added '{most_popular_track['name']}' (Popularity: {highest_popularity}) from {entry['Artist']} - {entry['Album']}")
+            else:
+                # Add all tracks from the album
+                album_uris = [track['uri'] for track in album_tracks]
+                track_uris.extend(album_uris)
+
+        track_uris = list(dict.fromkeys(track_uris))  # Remove any duplicates, keeping album order
 
         if track_uris:
             await playlist_manager.add_tracks(playlist_id, track_uris)
@@ -978,21 +1580,13 @@ async def main():
     """Main application entry point with improved error handling and user interaction"""
     try:
         # Validate environment variables
-        required_env_vars = [
-            "SPOTIPY_CLIENT_ID",
-            "SPOTIPY_CLIENT_SECRET",
-            "SPOTIPY_REDIRECT_URI",
-            "OPENAI_API_KEY"
-        ]
-        
-        missing_vars = [var for var in required_env_vars if not os.getenv(var)]
+        missing_vars = [var for var in REQUIRED_ENV_VARS if not os.environ.get(var)]
         if missing_vars:
             user_message(f"Missing required environment variables: {', '.join(missing_vars)}")
             return
 
         # Create JSON directory if it doesn't exist
-        json_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "JSON"))
-        os.makedirs(json_dir, exist_ok=True)
+        os.makedirs(JSON_DIR, exist_ok=True)
 
         while True:
             user_message("\nSpotScraper Menu:")
@@ -1001,25 +1595,25 @@ async def main():
             user_message("3. Create Spotify playlist from JSON")
             user_message("4. Exit")
             
-            choice = input("\nEnter your choice (1-4): ").strip()
+            choice = (await user_input("\nEnter your choice (1-4): ")).strip()
             
             if choice == "1":
-                url = input("\nEnter URL to scan for Spotify links: ").strip()
+                url = (await user_input("\nEnter URL to scan for Spotify links: ")).strip()
                 if not url:
                     user_message("No URL provided")
                     continue
 
-                default_path = os.path.normpath(os.path.join(json_dir, "spotscrape_url.json"))
+                default_path = DEFAULT_URL_RESULTS
                 
                 user_message("\nWhere would you like to save the results?")
                 user_message(f"1. Default location ({default_path})")
                 user_message("2. Custom location")
                 user_message("3. Exit to main menu")
                 
-                file_choice = input("Choose (1-3): ").strip()
+                file_choice = (await user_input("Choose (1-3): ")).strip()
                 
                 if file_choice == "2":
-                    destination_file = input("Enter full path for JSON file (or 'b' to go back): ").strip()
+                    destination_file = (await user_input("Enter full path for JSON file (or 'b' to go back): ")).strip()
                     if destination_file.lower() == 'b':
                         continue
                     destination_file = os.path.normpath(os.path.expanduser(destination_file))
@@ -1037,22 +1631,22 @@ async def main():
                 user_message("Scan complete!")
 
             elif choice == "2":
-                url = input("\nEnter URL to scan: ").strip()
+                url = (await user_input("\nEnter URL to scan: ")).strip()
                 if not url:
                     user_message("No URL provided")
                     continue
 
-                default_path = os.path.normpath(os.path.join(json_dir, "spotscrape_gpt.json"))
+                default_path = DEFAULT_GPT_RESULTS
                 
                 user_message("\nWhere would you like to save the results?")
                 user_message(f"1. Default location ({default_path})")
                 user_message("2. Custom location")
                 user_message("3. Exit to main menu")
                 
-                file_choice = input("Choose (1-3): ").strip()
+                file_choice = (await user_input("Choose (1-3): ")).strip()
                 
                 if file_choice == "2":
-                    destination_file = input("Enter full path for JSON file (or 'b' to go back): ").strip()
+                    destination_file = (await user_input("Enter full path for JSON file (or 'b' to go back): ")).strip()
                     if destination_file.lower() == 'b':
                         continue
                     destination_file = os.path.normpath(os.path.expanduser(destination_file))
@@ -1071,8 +1665,8 @@ async def main():
 
             elif choice == "3":
                 # Show both default files as options
-                url_default = os.path.normpath(os.path.join(json_dir, "spotscrape_url.json"))
-                gpt_default = os.path.normpath(os.path.join(json_dir, "spotscrape_gpt.json"))
+                url_default = DEFAULT_URL_RESULTS
+                gpt_default = DEFAULT_GPT_RESULTS
                 
                 user_message("\nEnter the path to your JSON file:")
                 user_message(f"1. URL scan results ({url_default})")
@@ -1080,7 +1674,7 @@ async def main():
                 user_message("3. Custom location")
                 user_message("4. Exit to main menu")
                 
-                file_choice = input("Choose (1-4): ").strip()
+                file_choice = (await user_input("Choose (1-4): ")).strip()
                 
                 if file_choice == "1":
                     json_file = url_default
@@ -1090,7 +1684,7 @@ async def main():
                     user_message("Returning to main menu")
                     continue
                 else:
-                    json_file = input("Enter full path to JSON file (or 'b' to go back): ").strip()
+                    json_file = (await user_input("Enter full path to JSON file (or 'b' to go back): ")).strip()
                     if json_file.lower() == 'b':
                         continue
                     json_file = os.path.normpath(os.path.expanduser(json_file))
@@ -1099,7 +1693,7 @@ async def main():
                     user_message(f"File not found: {json_file}")
                     continue
 
-                playlist_name = input("\nEnter playlist name (or press Enter for default): ").strip()
+                playlist_name = (await user_input("\nEnter playlist name (or press Enter for default): ")).strip()
                 await create_playlist(json_file, playlist_name)
 
             elif choice == "4":
@@ -1127,14 +1721,7 @@ if __name__ == "__main__":
         load_dotenv()
         
         # Validate environment variables
-        required_vars = [
-            "SPOTIPY_CLIENT_ID",
-            "SPOTIPY_CLIENT_SECRET",
-            "SPOTIPY_REDIRECT_URI",
-            "OPENAI_API_KEY"
-        ]
-        
-        missing_vars = [var for var in required_vars if not os.getenv(var)]
+        missing_vars = [var for var in REQUIRED_ENV_VARS if not os.environ.get(var)]
         if missing_vars:
             logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
             sys.exit(1)